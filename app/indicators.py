@@ -0,0 +1,62 @@
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True, fastmath={"contract", "arcp", "reassoc"})
+def compute_indicators(close):
+    """SMA 20, EMA 20 and RSI 14 computed in a single pass over the prices.
+    SMA and EMA (alpha = 2 / 21, seeded with the first close) are NaN for the
+    first 19 rows. RSI uses Wilder's smoothing: the first average gain/loss is
+    the plain mean of the first 14 changes, later values follow
+    avg = (avg * 13 + change) / 14, and it is NaN for the first 14 rows.
+    Parameters:
+        close (np.ndarray): Closing prices.
+    Returns:
+        tuple: (sma_20, ema_20, rsi_14) as float32 arrays.
+    """
+    n = close.shape[0]
+    sma_out = np.full(n, np.nan, dtype=np.float32)
+    ema_out = np.full(n, np.nan, dtype=np.float32)
+    rsi_out = np.full(n, np.nan, dtype=np.float32)
+    if n == 0:
+        return sma_out, ema_out, rsi_out
+
+    alpha = 2.0 / 21.0
+    total = 0.0
+    e = close[0]
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(n):
+        x = close[i]
+
+        # SMA 20: running window sum
+        total += x
+        if i >= 20:
+            total -= close[i - 20]
+        if i >= 19:
+            sma_out[i] = total / 20.0
+
+        # EMA 20: seeded with the first close
+        if i > 0:
+            e = alpha * x + (1.0 - alpha) * e
+        if i >= 19:
+            ema_out[i] = e
+
+        # RSI 14: plain mean of the first 14 changes, then Wilder smoothing
+        if i > 0:
+            delta = x - close[i - 1]
+            gain = delta if delta > 0 else 0.0
+            loss = -delta if delta < 0 else 0.0
+            if i <= 14:
+                avg_gain += gain / 14.0
+                avg_loss += loss / 14.0
+            else:
+                avg_gain = (avg_gain * 13.0 + gain) / 14.0
+                avg_loss = (avg_loss * 13.0 + loss) / 14.0
+            if i >= 14:
+                if avg_loss == 0.0:
+                    rsi_out[i] = 100.0
+                else:
+                    rsi_out[i] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+    return sma_out, ema_out, rsi_out
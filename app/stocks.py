@@ -1,87 +1,332 @@
 import streamlit as st
+import asyncio
+import aiohttp
 import concurrent.futures
-import yfinance as yf
 import pandas as pd
-import ta  
-import time
+import threading
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
 import plotly.express as px
 import plotly.graph_objects as go
-import io
+import os
+from indicators import compute_indicators
+
+
+# Upper bound on fetch threads shared by every session of the app
+MAX_FETCH_WORKERS = 32
+# Upper bound on concurrent HTTP connections to Yahoo
+MAX_CONNECTIONS = 32
+YAHOO_CHART_URL = "https://query1.finance.yahoo.com/v8/finance/chart/{ticker}"
+# Yahoo answers 429 to requests without a browser-like user agent
+YAHOO_HEADERS = {"User-Agent": "Mozilla/5.0"}
+# Per-request timeout, so a hung connection fails fast and gets retried
+YAHOO_TIMEOUT = aiohttp.ClientTimeout(total=10)
+# Errors worth retrying; anything else is a bug and propagates
+TRANSIENT_HTTP_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError)
+# Columns kept after indicators are computed; float32 is plenty for charting
+STOCK_DATA_DTYPES = {"Close": "float32", "Volume": "int64", "SMA_20": "float32", "EMA_20": "float32", "RSI_14": "float32"}
+
+
+@st.cache_resource(show_spinner=False)
+def _get_executor():
+    """Return the process-wide thread pool used for fetching stock data.
+    Worker threads are started lazily, so only as many threads as there are
+    in-flight fetches (capped at MAX_FETCH_WORKERS) are ever created.
+    Returns:
+        concurrent.futures.ThreadPoolExecutor: Shared thread pool.
+    """
+    return concurrent.futures.ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS)
+
+
+async def _open_session():
+    """Create the aiohttp session for Yahoo requests on the running loop.
+    Returns:
+        aiohttp.ClientSession: Session with a pooled connector.
+    """
+    connector = aiohttp.TCPConnector(limit=MAX_CONNECTIONS)
+    return aiohttp.ClientSession(connector=connector, headers=YAHOO_HEADERS, timeout=YAHOO_TIMEOUT)
+
+
+@st.cache_resource(show_spinner=False)
+def _get_fetch_loop():
+    """Return the process-wide event loop and the aiohttp session bound to it.
+    The loop runs forever in a daemon thread, so every Yahoo request from
+    every session goes through one loop and one connection pool.
+    Returns:
+        tuple: (asyncio.AbstractEventLoop, aiohttp.ClientSession)
+    """
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="yahoo-fetch-loop", daemon=True).start()
+    session = asyncio.run_coroutine_threadsafe(_open_session(), loop).result()
+    return loop, session
+
+
+def _add_indicators(data):
+    """Add SMA 20, EMA 20 and RSI 14 columns to a price history DataFrame.
+    Only the columns used downstream are returned (see STOCK_DATA_DTYPES).
+    Parameters:
+        data (pd.DataFrame): Price history with "Close" and "Volume" columns.
+    Returns:
+        pd.DataFrame: Stock data with technical indicators.
+    """
+    close = data["Close"].to_numpy(dtype="float64")
+    data["SMA_20"], data["EMA_20"], data["RSI_14"] = compute_indicators(close)
+    data["Volume"] = data["Volume"].fillna(0)
+    return data[list(STOCK_DATA_DTYPES)].astype(STOCK_DATA_DTYPES)
+
+
+@retry(
+    retry=retry_if_exception_type(TRANSIENT_HTTP_ERRORS),
+    stop=stop_after_attempt(3),
+    wait=wait_exponential(multiplier=1, min=1, max=10),
+    reraise=True,
+)
+async def _fetch_one(session, ticker):
+    """Fetch 6 months of daily history for a ticker from Yahoo's chart API.
+    Parameters:
+        session (aiohttp.ClientSession): Shared HTTP session.
+        ticker (str): Stock ticker symbol.
+    Returns:
+        pd.DataFrame: Stock data with technical indicators, or None if Yahoo has no data.
+    """
+    url = YAHOO_CHART_URL.format(ticker=ticker)
+    async with session.get(url, params={"range": "6mo", "interval": "1d"}) as response:
+        if response.status == 404:  # Unknown ticker
+            return None
+        response.raise_for_status()
+        payload = await response.json()
+
+    results = payload["chart"]["result"]
+    if not results or "timestamp" not in results[0]:
+        return None
+
+    result = results[0]
+    quote = result["indicators"]["quote"][0]
+    index = pd.to_datetime(result["timestamp"], unit="s", utc=True).tz_convert(result["meta"]["exchangeTimezoneName"]).normalize()
+    data = pd.DataFrame(
+        {
+            "Open": quote["open"],
+            "High": quote["high"],
+            "Low": quote["low"],
+            "Close": quote["close"],
+            "Volume": quote["volume"],
+        },
+        index=index,
+        dtype="float64",
+    ).dropna(subset=["Close"])  # A NaN close would poison the running SMA/EMA state
+    data.index.name = "Date"
+
+    if data.empty:
+        return None
+
+    return _add_indicators(data)
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _fetch_stock_data_cached(ticker):
+    """Download 6 months of history for a ticker and add technical indicators.
+    Results are cached for 5 minutes so reruns don't hit Yahoo again. The
+    request itself runs on the shared fetch loop (see _get_fetch_loop); the
+    calling thread only waits for it.
+    Errors that survive the retries propagate, so st.cache_data does not
+    memoize them and the next rerun asks Yahoo again.
+    Parameters:
+        ticker (str): Stock ticker symbol.
+    Returns:
+        pd.DataFrame: Stock data with technical indicators, or None if Yahoo has no data.
+    """
+    loop, session = _get_fetch_loop()
+    return asyncio.run_coroutine_threadsafe(_fetch_one(session, ticker), loop).result()
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _to_csv(data):
+    """Serialize stock data to CSV bytes for the download button.
+    Keyed on the data itself, so a refetch that updates today's row also
+    refreshes the download.
+    Parameters:
+        data (pd.DataFrame): Stock data to serialize.
+    Returns:
+        bytes: UTF-8 encoded CSV.
+    """
+    return data.to_csv(index=True).encode()
+
+
+# Hash a date index by its span and length instead of every timestamp
+_INDEX_HASH_FUNCS = {pd.DatetimeIndex: lambda idx: (idx[0], idx[-1], len(idx))}
+
+
+@st.cache_data(hash_funcs=_INDEX_HASH_FUNCS, ttl=300, max_entries=100, show_spinner=False)
+def _build_price_fig(ticker, close, sma_20, ema_20, idx):
+    """Build the price chart with SMA & EMA overlays.
+    Parameters:
+        ticker (str): Stock ticker symbol.
+        close (np.ndarray): Closing prices.
+        sma_20 (np.ndarray): SMA 20 values.
+        ema_20 (np.ndarray): EMA 20 values.
+        idx (pd.DatetimeIndex): Dates of the rows.
+    Returns:
+        go.Figure: Price chart.
+    """
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(x=idx, y=close, mode='lines', name='Close Price', line=dict(color='blue')))
+    fig.add_trace(go.Scattergl(x=idx, y=sma_20, mode='lines', name='SMA 20', line=dict(color='orange')))
+    fig.add_trace(go.Scattergl(x=idx, y=ema_20, mode='lines', name='EMA 20', line=dict(color='green')))
+    fig.update_layout(title=f"{ticker} Stock Price with SMA & EMA", xaxis_title="Date", yaxis_title="Price (USD)", template="plotly_dark")
+    return fig
+
+
+@st.cache_data(hash_funcs=_INDEX_HASH_FUNCS, ttl=300, max_entries=100, show_spinner=False)
+def _build_vol_fig(ticker, volume, idx):
+    """Build the trading volume bar chart.
+    Parameters:
+        ticker (str): Stock ticker symbol.
+        volume (np.ndarray): Traded volume.
+        idx (pd.DatetimeIndex): Dates of the rows.
+    Returns:
+        go.Figure: Volume chart.
+    """
+    return px.bar(x=idx, y=volume, title=f"{ticker} Trading Volume", labels={"x": "Date", "y": "Volume"}, template="plotly_dark")
+
+
+@st.cache_data(hash_funcs=_INDEX_HASH_FUNCS, ttl=300, max_entries=100, show_spinner=False)
+def _build_rsi_fig(ticker, rsi_14, idx):
+    """Build the RSI chart with overbought/oversold levels.
+    Parameters:
+        ticker (str): Stock ticker symbol.
+        rsi_14 (np.ndarray): RSI 14 values.
+        idx (pd.DatetimeIndex): Dates of the rows.
+    Returns:
+        go.Figure: RSI chart.
+    """
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(x=idx, y=rsi_14, mode='lines', name='RSI 14', line=dict(color='purple')))
+    fig.add_hline(y=70, line_dash="dash", line_color="red", annotation_text="Overbought")
+    fig.add_hline(y=30, line_dash="dash", line_color="green", annotation_text="Oversold")
+    fig.update_layout(title=f"{ticker} RSI Indicator", xaxis_title="Date", yaxis_title="RSI", template="plotly_dark")
+    return fig
+
+
+@st.cache_data
+def load_stock_tickers(file_path):
+    """Load stock tickers and company names from a local CSV file.
+    The parsed table is saved next to the CSV as Parquet and reused until
+    the CSV changes.
+    Parameters:
+        file_path (str): Path to the CSV file.
+    Returns:
+        pd.DataFrame: DataFrame containing stock tickers and company names.
+    """
+    try:
+        parquet_path = file_path + ".parquet"
+        if os.path.exists(parquet_path) and os.path.getmtime(parquet_path) >= os.path.getmtime(file_path):
+            df = pd.read_parquet(parquet_path, dtype_backend="pyarrow")
+        else:
+            df = pd.read_csv(
+                file_path,
+                usecols=["ACT Symbol", "Company Name"],
+                engine="pyarrow",
+                dtype_backend="pyarrow",
+            )
+            # Write to a temporary file first so an interrupted write never
+            # leaves a truncated cache that looks newer than the CSV
+            tmp_path = parquet_path + ".tmp"
+            try:
+                df.to_parquet(tmp_path, index=False)
+                os.replace(tmp_path, parquet_path)
+            except OSError:
+                pass  # Read-only checkout: keep serving from the CSV
+        return df.rename(columns={"ACT Symbol": "Ticker", "Company Name": "Company"})
+    except Exception as e:
+        return None
+
+
+@st.fragment
+def render_charts(ticker, data):
+    """Render the price, volume and RSI charts for one ticker on demand.
+    Runs as a fragment, so toggling the charts only reruns this function
+    and not the whole script.
+    Parameters:
+        ticker (str): Stock ticker symbol.
+        data (pd.DataFrame): Stock data with technical indicators.
+    """
+    if not st.toggle("Load charts", key=f"load_{ticker}"):
+        return
+
+    # Create two columns for charts
+    col1, col2 = st.columns(2)
+
+    # Stock Price Chart with SMA & EMA
+    with col1:
+        fig = _build_price_fig(ticker, data["Close"].to_numpy(), data["SMA_20"].to_numpy(), data["EMA_20"].to_numpy(), data.index)
+        st.plotly_chart(fig, use_container_width=True)
+
+    # Volume Bar Chart
+    with col2:
+        fig_vol = _build_vol_fig(ticker, data["Volume"].to_numpy(), data.index)
+        st.plotly_chart(fig_vol, use_container_width=True)
+
+    # RSI Chart
+    fig_rsi = _build_rsi_fig(ticker, data["RSI_14"].to_numpy(), data.index)
+    st.plotly_chart(fig_rsi, use_container_width=True)
 
 
 class Stock:
     def __init__(self, ticker):
         self.ticker = ticker
         self.ticker_company_path = "data/nyse.csv"
-        self.data = None
+        self.pool = _get_executor()
 
-    def fetch_stock_data(self, ticker):
-        """Fetch real-time stock data along with technical indicators.
+    def iter_multiple_stocks(self, tickers):
+        """Fetch multiple stocks in parallel, yielding each one as soon as it arrives.
+        Each ticker is fetched and retried on its own, so one slow or failing
+        ticker never holds back the others.
         Parameters:
-            ticker (str): Stock ticker symbol.
-        Returns:
-            pd.DataFrame: Stock data with technical indicators. 
+            tickers (tuple): Stock tickers.
+        Yields:
+            tuple: (ticker, pd.DataFrame) for each ticker that returned data.
         """
-        try:
-            stock = yf.Ticker(ticker)
-            data = stock.history(period="6mo")  # Fetch last 6 months of data
+        future_to_ticker = {self.pool.submit(_fetch_stock_data_cached, ticker): ticker for ticker in tickers}
 
-            if data.empty:
-                return None
-
-            # Calculate Technical Indicators
-            data["SMA_20"] = ta.trend.sma_indicator(data["Close"], window=20)
-            data["EMA_20"] = ta.trend.ema_indicator(data["Close"], window=20)
-            data["RSI_14"] = ta.momentum.rsi(data["Close"], window=14)
+        for future in concurrent.futures.as_completed(future_to_ticker):
+            try:
+                data = future.result()
+            except TRANSIENT_HTTP_ERRORS:
+                continue  # Still failing after retries; not cached, so the next run retries it
+            if data is not None:
+                yield future_to_ticker[future], data
+
+    def render_stock(self, ticker, data):
+        """Render the header, download button and charts for one ticker.
+        Parameters:
+            ticker (str): Stock ticker symbol.
+            data (pd.DataFrame): Stock data with technical indicators.
+        """
+        # Create layout with columns: Title & Download Button
+        col1, col2 = st.columns([0.8, 0.2])  # Adjust proportions for spacing
 
-            return data
-        except Exception as e:
-            return None
+        with col1:
+            st.subheader(f"📊 {ticker} Stock Data")
 
+        with col2:
+            st.download_button(
+                label="📥 Download CSV",
+                data=_to_csv(data),
+                file_name=f"{ticker}_stock_data.csv",
+                mime="text/csv",
+            )
 
-    def fetch_multiple_stocks(self, tickers, max_attempts=3):
-        """Fetch multiple stocks in parallel using threads.
-        Parameters:
-            tickers (list): List of stock tickers.
-            max_attempts (int): Maximum number of attempts to fetch the data.
-        Returns:
-            dict: Dictionary containing stock data for each ticker.
-        """
-        stock_data = {}
+        # Expander for charts; figures are only built once the user asks for them
+        with st.expander(f"View {ticker} Analysis"):
+            render_charts(ticker, data)
 
-        for attempt in range(max_attempts):
-            try:
-                with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-                    future_to_ticker = {executor.submit(self.fetch_stock_data, ticker): ticker for ticker in tickers}
-
-                    for future in concurrent.futures.as_completed(future_to_ticker):
-                        ticker = future_to_ticker[future]
-                        data = future.result()
-                        if data is not None:
-                            stock_data[ticker] = data
-                return stock_data  # Successful attempt
-            except Exception as e:
-                time.sleep(5)
-
-        return {}
-
-    @st.cache_data
-    def load_stock_tickers(_self, _file_path):
-        """Load stock tickers and company names from a local CSV file.
-        Parameters:
-            file_path (str): Path to the CSV file.
-        Returns:
-            pd.DataFrame: DataFrame containing stock tickers and company names.
-        """
-        try:
-            df = pd.read_csv(_file_path)
-            return df[["ACT Symbol", "Company Name"]].rename(columns={"ACT Symbol": "Ticker", "Company Name": "Company"})
-        except Exception as e:
-            return None
+        # Add a divider between different stocks
+        st.divider()
 
     def app(self):
-        # Streamlit App
-        st.set_page_config(page_title="Stock Market Tracker", page_icon="📈", layout="wide")
+        # Streamlit App (page config only needs to be sent once per session)
+        if "configured" not in st.session_state:
+            st.set_page_config(page_title="Stock Market Tracker", page_icon="📈", layout="wide")
+            st.session_state.configured = True
 
         # Streamlit Sidebar Navigation
         st.sidebar.title("Stock Market Tracker")
@@ -95,66 +340,30 @@ class Stock:
             # Sidebar: Input tickers
             self.ticker = st.text_input("Enter stock tickers (comma-separated)", self.ticker)
 
-            # Convert input string to list
-            tickers = [ticker.strip().upper() for ticker in self.ticker.split(",")]
+            # Convert input string to a de-duplicated tuple, only when the input changes
+            if st.session_state.get("_raw") != self.ticker:
+                st.session_state._tickers = tuple(dict.fromkeys(ticker.strip().upper() for ticker in self.ticker.split(",") if ticker.strip()))
+                st.session_state._raw = self.ticker
+            tickers = st.session_state._tickers
 
             # Button to fetch data
             if st.button("Fetch Stock Data"):
                 st.write("Fetching stock data... 📊")
-                stock_data = self.fetch_multiple_stocks(tickers)
-
-                if stock_data:
-                    for ticker, data in stock_data.items():
-                        # Convert data to CSV for download
-                        csv_data = data.to_csv(index=True)
-                        csv_buffer = io.StringIO(csv_data)
-
-                        # Create layout with columns: Title & Download Button
-                        col1, col2 = st.columns([0.8, 0.2])  # Adjust proportions for spacing
-                        
-                        with col1:
-                            st.subheader(f"📊 {ticker} Stock Data")
-                        
-                        with col2:
-                            st.download_button(
-                                label="📥 Download CSV",
-                                data=csv_buffer.getvalue(),
-                                file_name=f"{ticker}_stock_data.csv",
-                                mime="text/csv",
-                            )
-
-                        # Expander for charts
-                        with st.expander(f"View {ticker} Analysis"):  
-                            
-                            # Create two columns for charts
-                            col1, col2 = st.columns(2)
-
-                            # Stock Price Chart with SMA & EMA
-                            with col1:
-                                fig = go.Figure()
-                                fig.add_trace(go.Scatter(x=data.index, y=data["Close"], mode='lines', name='Close Price', line=dict(color='blue')))
-                                fig.add_trace(go.Scatter(x=data.index, y=data["SMA_20"], mode='lines', name='SMA 20', line=dict(color='orange')))
-                                fig.add_trace(go.Scatter(x=data.index, y=data["EMA_20"], mode='lines', name='EMA 20', line=dict(color='green')))
-                                fig.update_layout(title=f"{ticker} Stock Price with SMA & EMA", xaxis_title="Date", yaxis_title="Price (USD)", template="plotly_dark")
-                                st.plotly_chart(fig, use_container_width=True)
-
-                            # Volume Bar Chart
-                            with col2:
-                                fig_vol = px.bar(data, x=data.index, y="Volume", title=f"{ticker} Trading Volume", labels={"Volume": "Volume"}, template="plotly_dark")
-                                st.plotly_chart(fig_vol, use_container_width=True)
-
-                            # RSI Chart
-                            fig_rsi = go.Figure()
-                            fig_rsi.add_trace(go.Scatter(x=data.index, y=data["RSI_14"], mode='lines', name='RSI 14', line=dict(color='purple')))
-                            fig_rsi.add_hline(y=70, line_dash="dash", line_color="red", annotation_text="Overbought")
-                            fig_rsi.add_hline(y=30, line_dash="dash", line_color="green", annotation_text="Oversold")
-                            fig_rsi.update_layout(title=f"{ticker} RSI Indicator", xaxis_title="Date", yaxis_title="RSI", template="plotly_dark")
-                            st.plotly_chart(fig_rsi, use_container_width=True)
-
-                        # Add a divider between different stocks
-                        st.divider()
-
-                else:
+                # One placeholder per ticker keeps the input order while
+                # each stock is rendered as soon as its data arrives
+                placeholders = {ticker: st.empty() for ticker in tickers}
+                rendered = set()
+
+                for ticker, data in self.iter_multiple_stocks(tickers):
+                    with placeholders[ticker].container():
+                        self.render_stock(ticker, data)
+                    rendered.add(ticker)
+
+                for ticker, placeholder in placeholders.items():
+                    if ticker not in rendered:
+                        placeholder.empty()
+
+                if not rendered:
                     st.warning("No data available for the entered tickers.")
 
 
@@ -165,7 +374,7 @@ class Stock:
             st.write("Loading stock tickers from local CSV file...")
 
             # Load the stock tickers from the local CSV file
-            df_tickers = self.load_stock_tickers(self.ticker_company_path)  
+            df_tickers = load_stock_tickers(self.ticker_company_path)  
             if df_tickers is not None:
                 st.dataframe(df_tickers, width=800, hide_index=True)
             else: